@@ -0,0 +1,177 @@
+"""
+Record/replay of upstream traffic (Google CSE searches and LLM completions).
+
+In ``record`` mode every upstream response is appended to a gzip-compressed
+JSON Lines cassette, keyed by a hash of the request. Each recording process
+writes its own ``<path>.<pid>`` segment, so that concurrent recorders (e.g. HTTP
+server workers) never interleave their gzip streams. In ``replay`` mode ``<path>``
+and all of its segments are loaded and merged, and responses are served from memory
+instead of calling the live services, optionally after a simulated per-service
+delay. ``off`` (the default) calls the services directly.
+"""
+import atexit
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+class Cassette:
+    """Records or replays upstream calls, keyed by request."""
+
+    def __init__(self, mode: str = "off", path: Optional[str] = None,
+                 latency: Optional[Dict[str, float]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Choose from: {', '.join(MODES)}")
+        if mode != "off" and not path:
+            raise ValueError(f"Cassette mode '{mode}' needs a cassette path")
+        self.mode = mode
+        self.path = path
+        self.latency = latency or {}
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Any] = {}
+        self._file = None
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_config(cls) -> "Cassette":
+        """Build a cassette from the SALARY_CASSETTE_* settings."""
+        return cls(config.cassette_mode, config.cassette_path, config.cassette_latency)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def call(self, kind: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """Return ``fn()`` (off/record) or its recorded result (replay)."""
+        if self.mode == "off":
+            return fn()
+        key = self._key(kind, request)
+        if self.mode == "replay":
+            return self._replay(kind, key)
+        response = fn()
+        self._record(kind, key, response)
+        return response
+
+    def stream(self, kind: str, request: Dict[str, Any], fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Stream text chunks from ``fn()``; replay yields the recorded text as one chunk."""
+        if self.mode == "off":
+            yield from fn()
+            return
+        key = self._key(kind, request)
+        if self.mode == "replay":
+            yield self._replay(kind, key)
+            return
+        chunks = []
+        for chunk in fn():
+            chunks.append(chunk)
+            yield chunk
+        self._record(kind, key, "".join(chunks))
+
+    async def astream(self, kind: str, request: Dict[str, Any],
+                      fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Async version of ``stream``."""
+        if self.mode == "off":
+            async for chunk in fn():
+                yield chunk
+            return
+        key = self._key(kind, request)
+        if self.mode == "replay":
+            yield self._replay(kind, key)
+            return
+        chunks = []
+        async for chunk in fn():
+            chunks.append(chunk)
+            yield chunk
+        self._record(kind, key, "".join(chunks))
+
+    def close(self):
+        """Flush and close the cassette file (record mode)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _key(self, kind: str, request: Dict[str, Any]) -> str:
+        payload = json.dumps({"kind": kind, "request": request}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _replay(self, kind: str, key: str) -> Any:
+        try:
+            response = self._responses[key]
+        except KeyError:
+            raise CassetteMiss(f"No recorded {kind} response for request {key[:12]} in {self.path}")
+        delay = self.latency.get(kind, 0)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    def _record(self, kind: str, key: str, response: Any):
+        line = json.dumps({"key": key, "kind": kind, "response": response}, default=str)
+        with self._lock:
+            self._responses[key] = response
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # One segment per process; appending starts a new gzip member,
+                # so earlier recordings under a reused pid are kept
+                self._file = gzip.open(f"{self.path}.{os.getpid()}", "at", encoding="utf-8")
+                atexit.register(self.close)
+            self._file.write(line + "\n")
+            # Sync-flush so that a killed process still leaves a readable cassette
+            self._file.flush()
+
+    def _load(self):
+        segments = [path for path in glob.glob(glob.escape(self.path) + ".*")
+                    if path[len(self.path) + 1:].isdigit()]
+        files = sorted(segments, key=os.path.getmtime)
+        if os.path.exists(self.path):
+            files.insert(0, self.path)
+        if not files:
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        count = 0
+        for path in files:
+            count += self._load_file(path)
+        logger.info(f"📼 Loaded {count} recorded responses from {len(files)} file(s) at {self.path}")
+
+    def _load_file(self, path: str) -> int:
+        count = 0
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._responses[entry["key"]] = entry["response"]
+                    count += 1
+        except (EOFError, zlib.error, json.JSONDecodeError, gzip.BadGzipFile):
+            # The recorder was stopped mid-write; keep everything before the cut
+            logger.warning(f"⚠️ Cassette {path} ends with a truncated entry")
+        return count
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+def get_cassette() -> Cassette:
+    """Process-wide cassette, created from config on first use."""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette.from_config()
+            if _cassette.enabled:
+                logger.info(f"📼 Cassette {_cassette.mode} mode: {_cassette.path}")
+        return _cassette
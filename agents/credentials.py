@@ -0,0 +1,183 @@
+"""
+Google Custom Search credential pool with persistent per-key quota accounting.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+    # CSE daily quotas reset at midnight Pacific time
+    _QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:  # Python < 3.9 or no tz database
+    _QUOTA_TIMEZONE = timezone.utc
+
+@dataclass(frozen=True)
+class Credential:
+    """One API key / search engine ID pair."""
+    api_key: str
+    cse_id: str
+
+    @property
+    def key_id(self) -> str:
+        """Stable identifier used in the usage store, so raw keys are never written to disk."""
+        return hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+
+class CredentialPool:
+    """Spread CSE requests across several keys, skipping exhausted, rate-limited or failing ones.
+
+    Usage is counted per key and per quota day in a small SQLite database so
+    that counts survive restarts and are shared by every process on the host.
+    """
+
+    def __init__(self, credentials: List[Tuple[str, str]], store_path: Optional[str] = None,
+                 daily_quota: Optional[int] = None, cooldown_seconds: Optional[float] = None):
+        self.credentials = [Credential(api_key, cse_id) for api_key, cse_id in credentials]
+        if not self.credentials:
+            raise ValueError("CredentialPool needs at least one API key / CSE ID pair")
+        self.store_path = store_path or config.credential_store_path
+        self.daily_quota = daily_quota or config.cse_daily_quota
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else config.cse_cooldown_seconds
+        self._lock = threading.Lock()
+        self._init_store()
+
+    @classmethod
+    def from_config(cls) -> "CredentialPool":
+        """Build the pool from ``config.google_cse_credentials``."""
+        return cls(config.google_cse_credentials)
+
+    def acquire(self) -> Optional[Credential]:
+        """Reserve one request on the least-used available key, or None if all are unavailable."""
+        day = _quota_day()
+        now = time.time()
+        with self._lock, self._connect() as db:
+            usage = self._usage(db, day)
+            available = [
+                credential for credential in self.credentials
+                if usage[credential.key_id]["requests"] < self.daily_quota
+                and usage[credential.key_id]["blocked_until"] <= now
+            ]
+            if not available:
+                return None
+            credential = min(available, key=lambda c: usage[c.key_id]["requests"])
+            db.execute(
+                "UPDATE usage SET requests = requests + 1 WHERE key_id = ? AND day = ?",
+                (credential.key_id, day)
+            )
+            return credential
+
+    def report_error(self, credential: Credential, status_code: Optional[int] = None,
+                     quota_exhausted: bool = False, key_invalid: bool = False):
+        """Record a failed request.
+
+        Quota errors and invalid or revoked keys retire the key for the day;
+        403/429, server errors and network failures (no status) cool it down.
+        Other client errors concern the request, not the key.
+        """
+        day = _quota_day()
+        with self._lock, self._connect() as db:
+            self._usage(db, day)
+            db.execute(
+                "UPDATE usage SET errors = errors + 1 WHERE key_id = ? AND day = ?",
+                (credential.key_id, day)
+            )
+            if quota_exhausted or key_invalid:
+                if key_invalid:
+                    logger.error(f"❌ CSE key {credential.key_id} is invalid or revoked; retired for today")
+                else:
+                    logger.warning(f"⚠️ CSE key {credential.key_id} exhausted its daily quota")
+                db.execute(
+                    "UPDATE usage SET requests = MAX(requests, ?) WHERE key_id = ? AND day = ?",
+                    (self.daily_quota, credential.key_id, day)
+                )
+            elif status_code is None or status_code in (403, 429) or status_code >= 500:
+                logger.warning(f"⚠️ CSE key {credential.key_id} failed ({status_code or 'network error'}); cooling down {self.cooldown_seconds:.0f}s")
+                db.execute(
+                    "UPDATE usage SET blocked_until = ? WHERE key_id = ? AND day = ?",
+                    (time.time() + self.cooldown_seconds, credential.key_id, day)
+                )
+
+    def remaining_quota(self) -> int:
+        """Requests left today across all keys."""
+        return sum(entry["remaining"] for entry in self.status())
+
+    def status(self) -> List[Dict[str, object]]:
+        """Today's usage for each key."""
+        day = _quota_day()
+        now = time.time()
+        with self._lock, self._connect() as db:
+            usage = self._usage(db, day)
+        return [
+            {
+                "key_id": credential.key_id,
+                "requests": usage[credential.key_id]["requests"],
+                "errors": usage[credential.key_id]["errors"],
+                "remaining": max(0, self.daily_quota - usage[credential.key_id]["requests"]),
+                "rate_limited": usage[credential.key_id]["blocked_until"] > now,
+            }
+            for credential in self.credentials
+        ]
+
+    def _init_store(self):
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS usage (
+                    key_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (key_id, day)
+                )"""
+            )
+
+    def _connect(self) -> "_ClosingConnection":
+        # A short-lived connection per operation keeps the pool safe across threads and processes
+        return _ClosingConnection(sqlite3.connect(self.store_path, timeout=10))
+
+    def _usage(self, db: sqlite3.Connection, day: str) -> Dict[str, Dict[str, float]]:
+        db.executemany(
+            "INSERT OR IGNORE INTO usage (key_id, day) VALUES (?, ?)",
+            [(credential.key_id, day) for credential in self.credentials]
+        )
+        rows = db.execute(
+            "SELECT key_id, requests, errors, blocked_until FROM usage WHERE day = ?", (day,)
+        ).fetchall()
+        return {
+            key_id: {"requests": requests, "errors": errors, "blocked_until": blocked_until}
+            for key_id, requests, errors, blocked_until in rows
+        }
+
+class _ClosingConnection:
+    """Context manager that commits (or rolls back) and then closes a connection."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+        finally:
+            self.connection.close()
+
+def _quota_day() -> str:
+    return datetime.now(_QUOTA_TIMEZONE).strftime("%Y-%m-%d")
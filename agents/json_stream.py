@@ -0,0 +1,75 @@
+"""
+Incremental parser for JSON arrays of objects produced by streaming LLM output.
+"""
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class IncrementalJSONArrayParser:
+    """Extract complete top-level JSON objects from text as it arrives.
+
+    Feed chunks of model output in order; each call returns the objects that
+    were completed by that chunk. Text outside objects (array brackets, commas,
+    markdown fences, prose) is ignored, and an object that fails to decode is
+    skipped without affecting the ones around it. If the output is cut off,
+    everything completed before the cut has already been returned.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return any objects it completed."""
+        objects = []
+        start = 0 if self._depth else None
+
+        for i, char in enumerate(chunk):
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    start = i
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    text = "".join(self._parts)
+                    self._parts = []
+                    start = None
+                    obj = self._decode(text)
+                    if obj is not None:
+                        objects.append(obj)
+
+        if self._depth and start is not None:
+            self._parts.append(chunk[start:])
+        return objects
+
+    @property
+    def pending(self) -> bool:
+        """True if an object has been started but not yet completed."""
+        return self._depth > 0
+
+    def _decode(self, text: str):
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON object in model output: {e}")
+            return None
+        return obj if isinstance(obj, dict) else None
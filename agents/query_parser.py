@@ -1,6 +1,7 @@
 """
 Query Parser Agent for extracting job details from user queries.
 """
+import asyncio
 import json
 import re
 import logging
@@ -12,6 +13,7 @@ from langchain_core.prompts import PromptTemplate
 
 from config import config
 from models import ParsedQuery
+from agents.cassette import get_cassette
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,7 @@ class QueryParserAgent:
     """Agent responsible for parsing user queries into structured data."""
     
     def __init__(self):
+        self.cassette = get_cassette()
         self.llm = ChatGoogleGenerativeAI(
             model=config.gemini_model, 
             temperature=config.gemini_temperature
@@ -51,11 +54,15 @@ class QueryParserAgent:
         logger.info(f"🔍 Parsing query: {query}")
         
         chain = self.prompt | self.llm
-        response = chain.invoke({"query": query})
+        content = self.cassette.call(
+            "llm",
+            {"agent": "query_parser", "model": config.gemini_model, "query": query},
+            lambda: chain.invoke({"query": query}).content
+        )
         
         try:
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
+            json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
                 parsed_data = json.loads(json_match.group())
                 return ParsedQuery(
@@ -72,7 +79,8 @@ class QueryParserAgent:
     
     async def parse_query(self, query: str) -> ParsedQuery:
         """Async version for MCP tools."""
-        return self.parse_query_sync(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.parse_query_sync, query)
     
     def _fallback_parse(self, query: str) -> ParsedQuery:
         """Fallback parsing method using regex patterns."""
@@ -0,0 +1,264 @@
+"""
+Streaming table renderers for salary reports.
+
+Every renderer writes rows straight to a file-like sink instead of building
+the whole table in memory. Supported formats: grid, markdown, csv, jsonl
+and parquet (parquet needs the optional ``pyarrow`` package).
+"""
+import csv
+import io
+import json
+import logging
+import unicodedata
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Sequence
+
+from models import SalaryData
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADERS = ["Source", "Company", "Min Salary", "Max Salary", "Average Salary"]
+RECORD_FIELDS = ["source", "company", "currency", "min_salary", "max_salary", "average_salary"]
+# Column types for typed formats; a column that is all null would otherwise have no type
+RECORD_TYPES = {
+    "source": "string", "company": "string", "currency": "string",
+    "min_salary": "float64", "max_salary": "float64", "average_salary": "float64",
+}
+EMPTY_TABLE = "No data available"
+
+class Rows:
+    """Re-iterable view that formats rows on demand instead of storing them."""
+
+    def __init__(self, items: Sequence[Any], to_row: Callable[[Any], Sequence[Any]]):
+        self.items = items
+        self.to_row = to_row
+
+    def __iter__(self) -> Iterator[Sequence[Any]]:
+        return (self.to_row(item) for item in self.items)
+
+class TableRenderer:
+    """Base class for renderers that stream a table to a sink."""
+
+    # Display formats get human-formatted cells, data formats get raw values
+    display = True
+    binary = False
+
+    def render(self, headers: Sequence[str], rows: Iterable[Sequence[Any]], sink: IO,
+               types: Dict[str, str] = None) -> None:
+        """Write ``headers`` and ``rows`` to ``sink``; ``types`` maps columns to type aliases."""
+        raise NotImplementedError
+
+class GridRenderer(TableRenderer):
+    """Grid table in the layout of ``tabulate(..., tablefmt="grid")``.
+
+    Columns whose non-empty cells are all numbers (``int``/``float`` values)
+    are right-aligned, every other column is left-aligned. Cells containing
+    newlines span several lines and wide East Asian characters take two
+    columns. Unlike tabulate, cells are printed with ``str()`` as given:
+    numeric strings are not detected, floats are neither reformatted nor
+    aligned on the decimal point, and text is not stripped.
+    """
+
+    def render(self, headers, rows, sink, types=None):
+        if iter(rows) is rows:
+            # A one-shot iterator cannot be scanned twice, so keep its rows
+            rows = list(rows)
+        # First pass: widths and alignment; tabulate reserves two extra characters after each header
+        widths = [max(_display_width(line) for line in _lines(str(h))) + 2 for h in headers]
+        numbers = [0] * len(headers)
+        texts = [0] * len(headers)
+        for row in rows:
+            for i, value in enumerate(row[:len(headers)]):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numbers[i] += 1
+                elif value is not None:
+                    texts[i] += 1
+                widths[i] = max([widths[i]] + [_display_width(line) for line in _lines(_cell(value))])
+        aligns = ["right" if numbers[i] and not texts[i] else "left" for i in range(len(headers))]
+
+        # Second pass: format and write one row at a time
+        border = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+        sink.write(border + "\n")
+        sink.write(_grid_row([str(h) for h in headers], widths, aligns) + "\n")
+        sink.write("+" + "+".join("=" * (w + 2) for w in widths) + "+")
+        for row in rows:
+            cells = [_cell(row[i]) if i < len(row) else "" for i in range(len(headers))]
+            sink.write("\n" + _grid_row(cells, widths, aligns) + "\n" + border)
+
+class MarkdownRenderer(TableRenderer):
+    """GitHub-flavoured markdown (pipe) table."""
+
+    def render(self, headers, rows, sink, types=None):
+        if iter(rows) is rows:
+            rows = list(rows)
+        widths = _column_widths(headers, rows)
+        sink.write(_padded_line(headers, widths) + "\n")
+        sink.write("|" + "|".join(":" + "-" * (w + 1) for w in widths) + "|")
+        for row in rows:
+            sink.write("\n" + _padded_line(row, widths))
+
+class CSVRenderer(TableRenderer):
+    """Comma separated values with a header row."""
+
+    display = False
+
+    def render(self, headers, rows, sink, types=None):
+        writer = csv.writer(sink)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+
+class JSONLinesRenderer(TableRenderer):
+    """One JSON object per row."""
+
+    display = False
+
+    def render(self, headers, rows, sink, types=None):
+        for row in rows:
+            sink.write(json.dumps(dict(zip(headers, row))) + "\n")
+
+class ParquetRenderer(TableRenderer):
+    """Apache Parquet, written in row groups of ``batch_size`` rows."""
+
+    display = False
+    binary = True
+    batch_size = 10000
+
+    def render(self, headers, rows, sink, types=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+
+        writer = None
+        schema = None
+        batch: List[Sequence[Any]] = []
+
+        def flush():
+            nonlocal writer, schema
+            columns = {name: [row[i] for row in batch] for i, name in enumerate(headers)}
+            if schema is None:
+                schema = pa.schema([(name, self._column_type(pa, types, name, values))
+                                    for name, values in columns.items()])
+                writer = pq.ParquetWriter(sink, schema)
+            writer.write_table(pa.table(columns, schema=schema))
+            batch.clear()
+
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    flush()
+            if batch or writer is None:
+                flush()
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _column_type(self, pa, types, name: str, values: List[Any]):
+        if types and name in types:
+            return pa.type_for_alias(types[name])
+        inferred = pa.array(values).type
+        return pa.string() if pa.types.is_null(inferred) else inferred
+
+RENDERERS: Dict[str, type] = {
+    "grid": GridRenderer,
+    "markdown": MarkdownRenderer,
+    "csv": CSVRenderer,
+    "jsonl": JSONLinesRenderer,
+    "parquet": ParquetRenderer,
+}
+
+def get_renderer(fmt: str) -> TableRenderer:
+    """Return a renderer instance for the given format name."""
+    try:
+        renderer_class = RENDERERS[fmt.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown report format '{fmt}'. Choose from: {', '.join(RENDERERS)}")
+    return renderer_class()
+
+def salary_row(data: SalaryData) -> List[str]:
+    """Human-readable table cells for one salary data point."""
+    return [
+        data.source,
+        data.company or "N/A",
+        f"{data.currency} {data.min_salary:,.0f}" if data.min_salary else "N/A",
+        f"{data.currency} {data.max_salary:,.0f}" if data.max_salary else "N/A",
+        f"{data.currency} {data.average_salary:,.0f}" if data.average_salary else "N/A"
+    ]
+
+def salary_values(data: SalaryData) -> List[Any]:
+    """Raw values for one salary data point, in ``RECORD_FIELDS`` order."""
+    return [
+        data.source,
+        data.company,
+        data.currency,
+        _number(data.min_salary),
+        _number(data.max_salary),
+        _number(data.average_salary)
+    ]
+
+def render_salary_table(salary_data: Sequence[SalaryData], sink: IO, fmt: str = "grid") -> None:
+    """Stream a salary table for ``salary_data`` to ``sink``."""
+    renderer = get_renderer(fmt)
+    if renderer.display:
+        if not salary_data:
+            sink.write(EMPTY_TABLE)
+            return
+        renderer.render(SUMMARY_HEADERS, Rows(salary_data, salary_row), sink)
+    else:
+        renderer.render(RECORD_FIELDS, Rows(salary_data, salary_values), sink, RECORD_TYPES)
+
+def render_salary_table_to_string(salary_data: Sequence[SalaryData], fmt: str = "grid") -> str:
+    """Render a salary table into a string (text formats only)."""
+    buffer = io.StringIO()
+    render_salary_table(salary_data, buffer, fmt)
+    return buffer.getvalue()
+
+def _column_widths(headers: Sequence[str], rows: Iterable[Sequence[Any]],
+                   header_padding: int = 0) -> List[int]:
+    """Single pass over the rows to find each column's display width."""
+    widths = [_display_width(str(h)) + header_padding for h in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            length = _display_width(_cell(cell))
+            if length > widths[i]:
+                widths[i] = length
+    return widths
+
+def _padded_line(cells: Sequence[Any], widths: Sequence[int]) -> str:
+    return "| " + " | ".join(_pad(_cell(c), w) for c, w in zip(cells, widths)) + " |"
+
+def _grid_row(cells: Sequence[str], widths: Sequence[int], aligns: Sequence[str]) -> str:
+    """One (possibly multi-line) grid row."""
+    cell_lines = [_lines(cell) for cell in cells]
+    height = max((len(lines) for lines in cell_lines), default=1)
+    text_lines = []
+    for i in range(height):
+        text_lines.append("| " + " | ".join(
+            _pad(lines[i] if i < len(lines) else "", w, align)
+            for lines, w, align in zip(cell_lines, widths, aligns)
+        ) + " |")
+    return "\n".join(text_lines)
+
+def _lines(text: str) -> List[str]:
+    return text.splitlines() or [""]
+
+def _display_width(text: str) -> int:
+    """Terminal columns taken by ``text``: wide East Asian characters count twice, combining marks not at all."""
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+    return width
+
+def _pad(text: str, width: int, align: str = "left") -> str:
+    padding = " " * max(0, width - _display_width(text))
+    return padding + text if align == "right" else text + padding
+
+def _number(value: Any):
+    return None if value is None else float(value)
+
+def _cell(value: Any) -> str:
+    return "" if value is None else str(value)
@@ -1,9 +1,10 @@
 """
 Report Generation Agent for creating structured salary reports.
 """
+import sys
 import logging
-from typing import List
-from tabulate import tabulate
+from collections import Counter
+from typing import IO, Any, Dict, Iterable, List, Optional
 
 from models import ParsedQuery, SalaryData, StructuredSalaryReport
 
@@ -12,14 +13,18 @@ logger = logging.getLogger(__name__)
 class ReportGeneratorAgent:
     """Agent responsible for generating final structured reports."""
     
-    def generate_report(self, parsed_query: ParsedQuery, structured_data: List[SalaryData]) -> StructuredSalaryReport:
-        """Generate a comprehensive salary report."""
+    def generate_report(self, parsed_query: ParsedQuery, structured_data: Iterable[SalaryData]) -> StructuredSalaryReport:
+        """Generate a comprehensive salary report.
+        
+        ``structured_data`` may be a stream (e.g. StructuringAgent.stream_structure_data_sync);
+        rows are consumed as they arrive.
+        """
         logger.info("📊 Generating final report")
+        structured_data = list(structured_data)
         
         if not structured_data:
             return self._generate_empty_report(parsed_query)
         
-        summary_table = self._create_summary_table(structured_data)
         market_insights = self._generate_market_insights(parsed_query, structured_data)
         
         return StructuredSalaryReport(
@@ -27,8 +32,7 @@ class ReportGeneratorAgent:
             location=parsed_query.location,
             years_experience=parsed_query.years_experience,
             salary_data=structured_data,
-            market_insights=market_insights,
-            summary_table=summary_table
+            market_insights=market_insights
         )
     
     def _generate_empty_report(self, parsed_query: ParsedQuery) -> StructuredSalaryReport:
@@ -38,26 +42,9 @@ class ReportGeneratorAgent:
             location=parsed_query.location,
             years_experience=parsed_query.years_experience,
             salary_data=[],
-            market_insights="No salary data found for the specified criteria.",
-            summary_table="No data available"
+            market_insights="No salary data found for the specified criteria."
         )
     
-    def _create_summary_table(self, structured_data: List[SalaryData]) -> str:
-        """Create a formatted summary table."""
-        table_data = []
-        for data in structured_data:
-            row = [
-                data.source,
-                data.company or "N/A",
-                f"{data.currency} {data.min_salary:,.0f}" if data.min_salary else "N/A",
-                f"{data.currency} {data.max_salary:,.0f}" if data.max_salary else "N/A",
-                f"{data.currency} {data.average_salary:,.0f}" if data.average_salary else "N/A"
-            ]
-            table_data.append(row)
-        
-        headers = ["Source", "Company", "Min Salary", "Max Salary", "Average Salary"]
-        return tabulate(table_data, headers=headers, tablefmt="grid")
-    
     def _generate_market_insights(self, parsed_query: ParsedQuery, structured_data: List[SalaryData]) -> str:
         """Generate market insights from salary data."""
         total_salaries = self._extract_all_salaries(structured_data)
@@ -89,21 +76,45 @@ class ReportGeneratorAgent:
                 total_salaries.append(data.average_salary)
         
         return total_salaries
+    
+    def salary_statistics(self, structured_data: List[SalaryData]) -> Dict[str, Any]:
+        """Summary statistics (data points, min, average, max) for one set of salaries.
+        
+        Amounts in different currencies cannot be combined, so the statistics cover
+        the most common currency only; ``excluded`` counts the rows left out.
+        """
+        currencies = Counter(data.currency for data in structured_data if data.currency)
+        currency = currencies.most_common(1)[0][0] if currencies else None
+        rows = [data for data in structured_data if data.currency == currency]
+        total_salaries = self._extract_all_salaries(rows)
+        return {
+            "sources": len(rows),
+            "excluded": len(structured_data) - len(rows),
+            "data_points": len(total_salaries),
+            "min_salary": min(total_salaries) if total_salaries else None,
+            "average_salary": sum(total_salaries) / len(total_salaries) if total_salaries else None,
+            "max_salary": max(total_salaries) if total_salaries else None,
+            "currency": currency,
+        }
 
-    def print_formatted_report(self, report: StructuredSalaryReport):
-        """Print a beautifully formatted salary report."""
-        print("\n" + "="*80)
-        print("📊 SALARY ANALYSIS REPORT")
-        print("="*80)
-        print(f"🎯 Job Title: {report.job_title}")
-        print(f"📍 Location: {report.location}")
-        print(f"⏰ Experience Level: {report.years_experience}")
-        print("\n" + "-"*80)
-        print("📋 SALARY DATA TABLE")
-        print("-"*80)
-        print(report.summary_table)
-        print("\n" + "-"*80)
-        print("💡 MARKET INSIGHTS")
-        print("-"*80)
-        print(report.market_insights)
-        print("="*80)
\ No newline at end of file
+    def print_formatted_report(self, report: StructuredSalaryReport, sink: Optional[IO] = None,
+                               fmt: str = "grid"):
+        """Print a beautifully formatted salary report to ``sink`` (stdout by default)."""
+        sink = sink or sys.stdout
+        print("\n" + "="*80, file=sink)
+        print("📊 SALARY ANALYSIS REPORT", file=sink)
+        print("="*80, file=sink)
+        print(f"🎯 Job Title: {report.job_title}", file=sink)
+        print(f"📍 Location: {report.location}", file=sink)
+        print(f"⏰ Experience Level: {report.years_experience}", file=sink)
+        print("\n" + "-"*80, file=sink)
+        print("📋 SALARY DATA TABLE", file=sink)
+        print("-"*80, file=sink)
+        # Rows are streamed to the sink rather than built into one string
+        report.render(sink, fmt)
+        print(file=sink)
+        print("\n" + "-"*80, file=sink)
+        print("💡 MARKET INSIGHTS", file=sink)
+        print("-"*80, file=sink)
+        print(report.market_insights, file=sink)
+        print("="*80, file=sink)
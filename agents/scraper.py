@@ -1,13 +1,15 @@
 """
 Data Scraper Agent for gathering salary information from web sources.
 """
+import asyncio
 import time
 import requests
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from config import config
 from models import ParsedQuery
+from agents.credentials import CredentialPool
+from agents.cassette import get_cassette
 
 logger = logging.getLogger(__name__)
 
@@ -15,29 +17,59 @@ class ScraperAgent:
     """Enhanced scraper agent with multiple search strategies."""
     
     def __init__(self):
-        self.api_key = config.google_api_key
-        self.cse_id = config.google_cse_id
+        # Requests are spread over every configured API key / CSE ID pair
+        self.credentials = CredentialPool.from_config()
+        self.cassette = get_cassette()
         self.headers = {
             'User-Agent': 'JobSalaryScraper/2.0 (Educational Project; contact: your-email@example.com)'
         }
+        # Keep-alive connection pool, reused across searches (and queries in the daemon)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
     
     def scrape_data_sync(self, parsed_query: ParsedQuery) -> List[dict]:
         """Synchronous version for LangGraph compatibility."""
         logger.info(f"🕷️ Scraping data for: {parsed_query.job_title} in {parsed_query.location}")
         
-        search_queries = self._generate_search_queries(parsed_query)
+        search_queries = self.search_queries_for(parsed_query)
+        results = self.fetch_search_results(search_queries)
         
         all_results = []
-        for query in search_queries[:2]:  # Limit to avoid quota issues
-            results = self._search_google_sync(query)
-            all_results.extend(results)
-            time.sleep(1)  # Rate limiting
-        
+        for query in search_queries:
+            all_results.extend(results[query])
         return all_results
     
+    def search_queries_for(self, parsed_query: ParsedQuery) -> List[str]:
+        """The search queries actually sent for a parsed query."""
+        return self._generate_search_queries(parsed_query)[:2]  # Limit to avoid quota issues
+    
+    def grid_search_queries_for(self, parsed_query: ParsedQuery) -> List[str]:
+        """Search queries for one cell of a comparison grid.
+        
+        The second query leaves out the experience level, so every experience
+        level of the same title and location shares one search. An empty
+        experience level is left out of the first query too.
+        """
+        queries = self._generate_search_queries(parsed_query)
+        return [" ".join(queries[0].split()), queries[2]]
+    
+    def fetch_search_results(self, search_queries: List[str]) -> Dict[str, List[dict]]:
+        """Run each distinct search query once and return the results per query."""
+        results = {}
+        for query in search_queries:
+            if query in results:
+                continue
+            results[query] = self._search_google_sync(query)
+            if self.cassette.mode != "replay":
+                time.sleep(1)  # Rate limiting
+        
+        logger.info(f"🔑 Google CSE quota remaining today: {self.credentials.remaining_quota()}")
+        return results
+    
     async def scrape_data(self, parsed_query: ParsedQuery) -> List[dict]:
         """Async version for MCP tools."""
-        return self.scrape_data_sync(parsed_query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.scrape_data_sync, parsed_query)
     
     def _generate_search_queries(self, parsed_query: ParsedQuery) -> List[str]:
         """Generate search queries for comprehensive data gathering."""
@@ -49,31 +81,87 @@ class ScraperAgent:
         ]
     
     def _search_google_sync(self, query: str) -> List[dict]:
-        """Synchronous Google Custom Search API."""
-        url = f"https://www.googleapis.com/customsearch/v1?key={self.api_key}&cx={self.cse_id}&q={query}"
+        """Synchronous Google Custom Search API (recorded/replayed by the cassette)."""
+        return self.cassette.call("cse", {"q": query}, lambda: self._search_google_live(query))
+    
+    def _search_google_live(self, query: str) -> List[dict]:
+        """Query the live Google Custom Search API."""
+        url = "https://www.googleapis.com/customsearch/v1"
         
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            items = data.get("items", [])
-            
-            extracted_results = []
-            for item in items[:5]:  # Top 5 results per query
-                result_info = {
-                    "title": item.get("title", "N/A"),
-                    "snippet": item.get("snippet", "N/A"),
-                    "link": item.get("link", "N/A"),
-                    "query": query
-                }
-                extracted_results.append(result_info)
-            
-            return extracted_results
+        # Try each key at most once; exhausted, rate-limited or failing keys are skipped
+        last_error = None
+        for _ in range(len(self.credentials.credentials)):
+            credential = self.credentials.acquire()
+            if credential is None:
+                break
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error fetching Google Custom Search API: {e}")
-            return [{"error": str(e), "query": query}]
+            try:
+                response = self.session.get(
+                    url,
+                    params={"key": credential.api_key, "cx": credential.cse_id, "q": query},
+                    timeout=10
+                )
+                if response.status_code in (403, 429):
+                    # Quota or rate limit on this key: record it and move to the next one
+                    self.credentials.report_error(
+                        credential,
+                        response.status_code,
+                        quota_exhausted=_is_quota_error(response)
+                    )
+                    logger.warning(f"⚠️ CSE key {credential.key_id} refused request ({response.status_code})")
+                    continue
+                response.raise_for_status()
+                data = response.json()
+                items = data.get("items", [])
+                
+                extracted_results = []
+                for item in items[:5]:  # Top 5 results per query
+                    result_info = {
+                        "title": item.get("title", "N/A"),
+                        "snippet": item.get("snippet", "N/A"),
+                        "link": item.get("link", "N/A"),
+                        "query": query
+                    }
+                    extracted_results.append(result_info)
+                
+                return extracted_results
+                
+            except requests.exceptions.RequestException as e:
+                status_code = e.response.status_code if e.response is not None else None
+                key_invalid = _is_invalid_key_error(e.response)
+                self.credentials.report_error(credential, status_code, key_invalid=key_invalid)
+                logger.error(f"❌ Error fetching Google Custom Search API with key {credential.key_id}: {e}")
+                if status_code is not None and 400 <= status_code < 500 and not key_invalid:
+                    # The request itself is bad; another key would get the same answer
+                    return [{"error": str(e), "query": query}]
+                last_error = str(e)
+        
+        if last_error is not None:
+            return [{"error": last_error, "query": query}]
+        error = f"No Google CSE quota left ({self.credentials.remaining_quota()} requests remaining today)"
+        logger.error(f"❌ {error}")
+        return [{"error": error, "query": query}]
     
     async def _search_google(self, query: str) -> List[dict]:
         """Async version for MCP tools."""
-        return self._search_google_sync(query)
\ No newline at end of file
+        return self._search_google_sync(query)
+
+def _is_invalid_key_error(response: Optional[requests.Response]) -> bool:
+    """True if Google rejected the API key itself (invalid, revoked or unauthorised)."""
+    if response is None:
+        return False
+    if response.status_code == 401:
+        return True
+    try:
+        errors = response.json().get("error", {}).get("errors", [])
+    except ValueError:
+        return False
+    return any(error.get("reason") in ("keyInvalid", "keyExpired") for error in errors)
+
+def _is_quota_error(response: requests.Response) -> bool:
+    """True if Google reports the daily quota (rather than a rate limit) as the cause."""
+    try:
+        errors = response.json().get("error", {}).get("errors", [])
+    except ValueError:
+        return False
+    return any(error.get("reason") in ("dailyLimitExceeded", "quotaExceeded") for error in errors)
@@ -2,8 +2,12 @@
 FastMCP Server implementation for the Salary Analyzer system.
 """
 import asyncio
-from typing import Dict, Any
-from fastmcp import FastMCP
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Any, Optional
+from fastmcp import FastMCP, Context
 
 # Assuming 'models' and 'agents' are correctly structured and accessible
 # You might need to adjust these imports based on your exact project structure
@@ -13,6 +17,10 @@ from models import ParsedQuery # Adjust if ParsedQuery is in a sub-module
 from agents.query_parser import QueryParserAgent
 from agents.scraper import ScraperAgent
 from agents.structuring import StructuringAgent
+from workflow.singleflight import AsyncSingleFlight
+from config import config
+
+logger = logging.getLogger(__name__)
 
 class SalaryAnalyzerMCP:
     """MCP Server for Salary Analyzer with tool endpoints."""
@@ -20,7 +28,21 @@ class SalaryAnalyzerMCP:
     def __init__(self):
         # Initialize FastMCP with a name for your analyzer
         self.mcp = FastMCP("SalaryAnalyzer")
+        # Identical concurrent tool calls share a single upstream computation
+        self.in_flight = AsyncSingleFlight()
+        # Agents are shared by all tool calls; created by warm_up()
+        self.parser_agent: Optional[QueryParserAgent] = None
+        self.scraper_agent: Optional[ScraperAgent] = None
+        self.structuring_agent: Optional[StructuringAgent] = None
         self.setup_tools()
+    
+    def warm_up(self):
+        """Create the agents and their LLM clients before serving traffic."""
+        if self.parser_agent is None:
+            logger.info(f"🔥 Warming up MCP worker (pid {os.getpid()})")
+            self.parser_agent = QueryParserAgent()
+            self.scraper_agent = ScraperAgent()
+            self.structuring_agent = StructuringAgent()
         
     def setup_tools(self):
         """Setup MCP tools for agent communication."""
@@ -32,9 +54,11 @@ class SalaryAnalyzerMCP:
             This tool will be exposed via the MCP server.
             """
             try:
-                parser_agent = QueryParserAgent()
+                self.warm_up()
+                parser_agent = self.parser_agent
                 # Await the async method of the agent
-                result = await parser_agent.parse_query(query)
+                key = ("parse", " ".join(query.lower().split()))
+                result = await self.in_flight.do(key, lambda: parser_agent.parse_query(query))
                 # Convert the result object to a dictionary for serialization
                 return {"success": True, "data": result.__dict__}
             except Exception as e:
@@ -48,9 +72,12 @@ class SalaryAnalyzerMCP:
             This tool will be exposed via the MCP server.
             """
             try:
-                scraper_agent = ScraperAgent()
+                self.warm_up()
+                scraper_agent = self.scraper_agent
                 # Reconstruct ParsedQuery object from dictionary for the agent
-                result = await scraper_agent.scrape_data(ParsedQuery(**parsed_query))
+                query = ParsedQuery(**parsed_query)
+                key = ("scrape",) + query.normalized_key()
+                result = await self.in_flight.do(key, lambda: scraper_agent.scrape_data(query))
                 # Return the scraped data
                 return {"success": True, "data": result}
             except Exception as e:
@@ -63,14 +90,43 @@ class SalaryAnalyzerMCP:
             This tool will be exposed via the MCP server.
             """
             try:
-                structuring_agent = StructuringAgent()
+                self.warm_up()
+                structuring_agent = self.structuring_agent
                 # Reconstruct ParsedQuery object from dictionary for the agent
-                result = await structuring_agent.structure_data(raw_data, ParsedQuery(**parsed_query))
+                query = ParsedQuery(**parsed_query)
+                # Include the payload so different raw data for one query is never merged
+                payload = json.dumps(raw_data, sort_keys=True, default=str)
+                digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+                key = ("structure",) + query.normalized_key() + (digest,)
+                result = await self.in_flight.do(key, lambda: structuring_agent.structure_data(raw_data, query))
                 # Convert list of objects to list of dictionaries for serialization
                 return {"success": True, "data": [item.__dict__ for item in result]}
             except Exception as e:
                 return {"success": False, "error": str(e)}
 
+        @self.mcp.tool()
+        async def stream_structure_salary_data(raw_data: list, parsed_query: Dict[str, Any], ctx: Context) -> Dict[str, Any]:
+            """
+            Structure scraped salary data, sending each row to the client as a
+            log message (with a progress update) as soon as the model produces it.
+            The complete list is also returned at the end.
+            """
+            try:
+                self.warm_up()
+                rows = []
+                async for item in self.structuring_agent.astream_structure_data(raw_data, ParsedQuery(**parsed_query)):
+                    rows.append(item.__dict__)
+                    await ctx.info(json.dumps(item.__dict__))
+                    await ctx.report_progress(progress=len(rows))
+                return {"success": True, "data": rows}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+    def http_app(self, transport: str = "streamable-http"):
+        """Build the ASGI app serving the tools over streamable HTTP (or SSE)."""
+        # Stateless HTTP lets any worker process answer any request
+        return self.mcp.http_app(transport=transport, stateless_http=transport != "sse")
+
     async def start_server(self):
         """
         Start the FastMCP server. This method is designed to be awaited
@@ -89,3 +145,41 @@ async def start_mcp_server():
     mcp_server = SalaryAnalyzerMCP()
     await mcp_server.start_server()
 
+def create_http_app():
+    """
+    ASGI application factory, called once in every worker process.
+    Each worker warms up its own agents before accepting connections.
+    """
+    mcp_server = SalaryAnalyzerMCP()
+    mcp_server.warm_up()
+    return mcp_server.http_app(os.environ.get("SALARY_MCP_TRANSPORT", "streamable-http"))
+
+def serve_http(host: Optional[str] = None, port: Optional[int] = None,
+               workers: Optional[int] = None, transport: str = "streamable-http"):
+    """
+    Serve the MCP tools over HTTP with a pool of worker processes.
+    Blocks until SIGINT/SIGTERM; in-flight requests are allowed to finish
+    within the configured graceful shutdown timeout.
+    """
+    import uvicorn
+
+    host = host or config.mcp_host
+    port = port or config.mcp_port
+    workers = workers or config.mcp_workers
+    if transport == "sse" and workers > 1:
+        # SSE sessions live in one process, so they cannot be spread over workers
+        logger.warning("⚠️ SSE transport keeps per-process sessions; using a single worker")
+        workers = 1
+
+    # Worker processes build their app from the import string, so pass the
+    # transport through the environment they inherit
+    os.environ["SALARY_MCP_TRANSPORT"] = transport
+    logger.info(f"🚀 Serving MCP over {transport} on http://{host}:{port} with {workers} worker(s)")
+    uvicorn.run(
+        "agents.server:create_http_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=config.mcp_graceful_shutdown_timeout,
+    )
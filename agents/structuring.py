@@ -1,18 +1,22 @@
 """
 Data Structuring Agent for formatting and organizing salary data.
 """
-import json
-import re
+import asyncio
 import logging
-from typing import List
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 
 from config import config
 from models import ParsedQuery, SalaryData
+from agents.json_stream import IncrementalJSONArrayParser
+from agents.cassette import get_cassette
 
 logger = logging.getLogger(__name__)
 
+# A streamed object is a salary row only if it has at least one of these keys
+SALARY_ROW_KEYS = ("min_salary", "max_salary", "average_salary", "source")
+
 class StructuringAgent:
     """Agent responsible for structuring and formatting salary data."""
     
@@ -21,6 +25,7 @@ class StructuringAgent:
             model=config.gemini_model, 
             temperature=config.gemini_temperature
         )
+        self.cassette = get_cassette()
         self.prompt = PromptTemplate(
             template="""
             You are a salary data analyst. Analyze the following search results and extract structured salary information.
@@ -53,38 +58,185 @@ class StructuringAgent:
             """,
             input_variables=["job_title", "location", "years_experience", "search_results"]
         )
+        self.batch_prompt = PromptTemplate(
+            template="""
+            You are a salary data analyst. Several job searches share the numbered search results below.
+            For each cell, extract salary information from the results listed for that cell only.
+            
+            Search Results:
+            {search_results}
+            
+            Cells:
+            {cells}
+            
+            Return one JSON array covering all cells, in this format:
+            [
+                {{
+                    "cell": cell number,
+                    "min_salary": number or null,
+                    "max_salary": number or null, 
+                    "average_salary": number or null,
+                    "currency": "USD" or appropriate currency,
+                    "source": "source website/company name",
+                    "company": "company name if mentioned or null"
+                }}
+            ]
+            
+            Convert salary formats like:
+            - "80k-120k" to min_salary: 80000, max_salary: 120000
+            - "$95,000" to average_salary: 95000
+            - "100-150k USD" to min_salary: 100000, max_salary: 150000
+            
+            Extract multiple salary data points per cell if available from different sources.
+            """,
+            input_variables=["search_results", "cells"]
+        )
     
     def structure_data_sync(self, raw_data: List[dict], parsed_query: ParsedQuery) -> List[SalaryData]:
         """Synchronous version for LangGraph compatibility."""
+        return list(self.stream_structure_data_sync(raw_data, parsed_query))
+    
+    def stream_structure_data_sync(self, raw_data: List[dict], parsed_query: ParsedQuery) -> Iterator[SalaryData]:
+        """Yield each SalaryData as soon as the model has finished writing it."""
         logger.info("🏗️ Structuring salary data")
         
-        search_results_str = self._format_search_results(raw_data)
-        
-        if not search_results_str:
-            return []
+        inputs = self._prompt_inputs(raw_data, parsed_query)
+        if inputs is None:
+            return
         
         chain = self.prompt | self.llm
-        response = chain.invoke({
-            "job_title": parsed_query.job_title,
-            "location": parsed_query.location,
-            "years_experience": parsed_query.years_experience,
-            "search_results": search_results_str
-        })
+        parser = IncrementalJSONArrayParser()
+        produced = 0
+        try:
+            chunks = self.cassette.stream(
+                "llm",
+                self._cassette_request(inputs),
+                lambda: (_chunk_text(chunk) for chunk in chain.stream(inputs))
+            )
+            for text in chunks:
+                for item in _salary_items(parser.feed(text)):
+                    produced += 1
+                    yield self._to_salary_data(item)
+        except Exception as e:
+            # Keep the rows already produced if the stream breaks part-way
+            if not produced:
+                raise
+            logger.error(f"Structuring stream interrupted after {produced} rows: {e}")
+        
+        if parser.pending:
+            logger.warning(f"Model output was truncated; kept {produced} complete rows")
+    
+    async def astream_structure_data(self, raw_data: List[dict], parsed_query: ParsedQuery) -> AsyncIterator[SalaryData]:
+        """Async streaming version for MCP tools."""
+        logger.info("🏗️ Structuring salary data (streaming)")
+        
+        inputs = self._prompt_inputs(raw_data, parsed_query)
+        if inputs is None:
+            return
         
+        chain = self.prompt | self.llm
+        parser = IncrementalJSONArrayParser()
+        produced = 0
         try:
-            # Extract JSON array from response
-            json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
-            if json_match:
-                salary_data_list = json.loads(json_match.group())
-                return self._convert_to_salary_data(salary_data_list)
+            chunks = self.cassette.astream(
+                "llm",
+                self._cassette_request(inputs),
+                lambda: _astream_text(chain, inputs)
+            )
+            async for text in chunks:
+                for item in _salary_items(parser.feed(text)):
+                    produced += 1
+                    yield self._to_salary_data(item)
         except Exception as e:
-            logger.error(f"Error parsing structured data: {e}")
+            if not produced:
+                raise
+            logger.error(f"Structuring stream interrupted after {produced} rows: {e}")
         
-        return []
+        if parser.pending:
+            logger.warning(f"Model output was truncated; kept {produced} complete rows")
+    
+    def structure_batch_sync(self, cells: List[Tuple[ParsedQuery, List[dict]]]) -> List[List[SalaryData]]:
+        """Structure several (parsed query, raw results) cells with a single LLM call.
+        
+        Search results shared by several cells are sent once and referenced by number.
+        Returns one list of SalaryData per cell, in input order.
+        """
+        logger.info(f"🏗️ Structuring salary data for {len(cells)} cells in one call")
+        
+        structured: List[List[SalaryData]] = [[] for _ in cells]
+        result_ids: Dict[Tuple[str, str, str], int] = {}
+        result_lines = []
+        cell_lines = []
+        for index, (parsed_query, raw_data) in enumerate(cells):
+            ids = []
+            for item in raw_data:
+                if 'error' in item:
+                    continue
+                fingerprint = (item['link'], item['title'], item['snippet'])
+                if fingerprint not in result_ids:
+                    result_ids[fingerprint] = len(result_ids) + 1
+                    result_lines.append(
+                        f"[R{result_ids[fingerprint]}] Title: {item['title']}\nSnippet: {item['snippet']}\nSource: {item['link']}\n---"
+                    )
+                if result_ids[fingerprint] not in ids:
+                    ids.append(result_ids[fingerprint])
+            if ids:
+                cell_lines.append(
+                    f"Cell {index}: {parsed_query.job_title} | {parsed_query.location} | "
+                    f"{parsed_query.years_experience or 'any experience'} -> results {', '.join(f'R{i}' for i in ids)}"
+                )
+        
+        if not cell_lines:
+            return structured
+        
+        inputs = {"search_results": "\n".join(result_lines), "cells": "\n".join(cell_lines)}
+        chain = self.batch_prompt | self.llm
+        parser = IncrementalJSONArrayParser()
+        chunks = self.cassette.stream(
+            "llm",
+            {"agent": "structuring_batch", "model": config.gemini_model, "inputs": inputs},
+            lambda: (_chunk_text(chunk) for chunk in chain.stream(inputs))
+        )
+        try:
+            for text in chunks:
+                for item in _salary_items(parser.feed(text)):
+                    # Models sometimes send the cell number as "0" or 0.0
+                    try:
+                        cell = int(item.get("cell"))
+                    except (TypeError, ValueError, OverflowError):
+                        cell = None
+                    if cell is not None and 0 <= cell < len(cells):
+                        structured[cell].append(self._to_salary_data(item))
+                    else:
+                        logger.warning(f"Dropping row with missing or unknown cell {item.get('cell')!r}: {item.get('source')}")
+        except Exception as e:
+            if not any(structured):
+                raise
+            logger.error(f"Batch structuring stream interrupted: {e}")
+        return structured
     
     async def structure_data(self, raw_data: List[dict], parsed_query: ParsedQuery) -> List[SalaryData]:
         """Async version for MCP tools."""
-        return self.structure_data_sync(raw_data, parsed_query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.structure_data_sync, raw_data, parsed_query)
+    
+    def _prompt_inputs(self, raw_data: List[dict], parsed_query: ParsedQuery):
+        """Build the prompt variables, or None when there is nothing to structure."""
+        search_results_str = self._format_search_results(raw_data)
+        
+        if not search_results_str:
+            return None
+        
+        return {
+            "job_title": parsed_query.job_title,
+            "location": parsed_query.location,
+            "years_experience": parsed_query.years_experience,
+            "search_results": search_results_str
+        }
+    
+    def _cassette_request(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        """Record/replay key for one structuring completion."""
+        return {"agent": "structuring", "model": config.gemini_model, "inputs": inputs}
     
     def _format_search_results(self, raw_data: List[dict]) -> str:
         """Format raw search results for LLM processing."""
@@ -95,14 +247,50 @@ class StructuringAgent:
     
     def _convert_to_salary_data(self, salary_data_list: List[dict]) -> List[SalaryData]:
         """Convert dictionary list to SalaryData objects."""
-        return [
-            SalaryData(
-                min_salary=item.get("min_salary"),
-                max_salary=item.get("max_salary"),
-                average_salary=item.get("average_salary"),
-                currency=item.get("currency", "USD"),
-                source=item.get("source", "Unknown"),
-                company=item.get("company")
-            )
-            for item in salary_data_list
-        ]
\ No newline at end of file
+        return [self._to_salary_data(item) for item in salary_data_list]
+    
+    def _to_salary_data(self, item: Dict[str, Any]) -> SalaryData:
+        """Convert one dictionary to a SalaryData object."""
+        return SalaryData(
+            min_salary=item.get("min_salary"),
+            max_salary=item.get("max_salary"),
+            average_salary=item.get("average_salary"),
+            currency=item.get("currency", "USD"),
+            source=item.get("source", "Unknown"),
+            company=item.get("company")
+        )
+
+def _salary_items(objects: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Salary rows among the top-level objects completed by the stream parser.
+    
+    A wrapper such as ``{"data": [...]}`` yields the rows in its lists; any other
+    object without salary or source keys (e.g. stray JSON in prose) is skipped.
+    """
+    for obj in objects:
+        if _is_salary_row(obj):
+            yield obj
+            continue
+        rows = [
+            item for value in obj.values() if isinstance(value, list)
+            for item in value if isinstance(item, dict) and _is_salary_row(item)
+        ]
+        if not rows:
+            logger.warning(f"Skipping JSON object without salary fields in model output: {list(obj)[:5]}")
+        yield from rows
+
+def _is_salary_row(obj: Dict[str, Any]) -> bool:
+    return any(key in obj for key in SALARY_ROW_KEYS)
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed message chunk (content may be a string or a list of parts)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content or ""
+
+async def _astream_text(chain, inputs: Dict[str, str]) -> AsyncIterator[str]:
+    async for chunk in chain.astream(inputs):
+        yield _chunk_text(chunk)
@@ -3,6 +3,8 @@ Configuration management for the Salary Analyzer system.
 """
 import os
 import logging
+import tempfile
+from typing import Dict, List, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +42,71 @@ class Config:
     def google_cse_id(self) -> str:
         return os.environ["GOOGLE_CSE_ID"]
     
+    @property
+    def google_cse_credentials(self) -> List[Tuple[str, str]]:
+        """API key / CSE ID pairs from GOOGLE_CSE_CREDENTIALS ("key1:cx1,key2:cx2"),
+        falling back to the single GOOGLE_API_KEY / GOOGLE_CSE_ID pair."""
+        raw = os.environ.get("GOOGLE_CSE_CREDENTIALS", "")
+        pairs = []
+        for entry in raw.split(","):
+            api_key, _, cse_id = entry.strip().partition(":")
+            if api_key and cse_id:
+                pairs.append((api_key, cse_id))
+        return pairs or [(self.google_api_key, self.google_cse_id)]
+    
+    @property
+    def cse_daily_quota(self) -> int:
+        return int(os.environ.get("GOOGLE_CSE_DAILY_QUOTA", "100"))
+    
+    @property
+    def cse_cooldown_seconds(self) -> float:
+        return float(os.environ.get("GOOGLE_CSE_COOLDOWN", "60"))
+    
+    @property
+    def credential_store_path(self) -> str:
+        return os.environ.get(
+            "SALARY_CREDENTIAL_STORE",
+            os.path.join(os.path.expanduser("~"), ".cache", "salary-analyzer", "cse_usage.db")
+        )
+    
+    @property
+    def daemon_socket(self) -> str:
+        user_id = os.getuid() if hasattr(os, "getuid") else 0
+        if os.environ.get("XDG_RUNTIME_DIR"):
+            default = os.path.join(os.environ["XDG_RUNTIME_DIR"], f"salary-analyzer-{user_id}.sock")
+        else:
+            # A private per-user directory, never a predictable name directly in /tmp
+            default = os.path.join(tempfile.gettempdir(), f"salary-analyzer-{user_id}", "daemon.sock")
+        return os.environ.get("SALARY_DAEMON_SOCKET", default)
+    
+    @property
+    def daemon_connect_timeout(self) -> float:
+        # Connecting and waiting for the daemon to acknowledge a query
+        return float(os.environ.get("SALARY_DAEMON_CONNECT_TIMEOUT", "2"))
+    
+    @property
+    def daemon_timeout(self) -> float:
+        # Waiting for the analysis result, and between chunks of the report
+        return float(os.environ.get("SALARY_DAEMON_TIMEOUT", "300"))
+    
+    @property
+    def cassette_mode(self) -> str:
+        return os.environ.get("SALARY_CASSETTE_MODE", "off")
+    
+    @property
+    def cassette_path(self) -> str:
+        return os.environ.get("SALARY_CASSETTE_PATH", "")
+    
+    @property
+    def cassette_latency(self) -> Dict[str, float]:
+        """Simulated replay delay per service from SALARY_CASSETTE_LATENCY ("cse=0.3,llm=1.2")."""
+        latency = {}
+        for entry in os.environ.get("SALARY_CASSETTE_LATENCY", "").split(","):
+            kind, _, seconds = entry.strip().partition("=")
+            if kind and seconds:
+                latency[kind] = float(seconds)
+        return latency
+    
     @property
     def gemini_model(self) -> str:
         return "gemini-2.5-flash-lite-preview-06-17"
@@ -47,6 +114,43 @@ class Config:
     @property
     def gemini_temperature(self) -> float:
         return 0.7
+    
+    @property
+    def mcp_host(self) -> str:
+        return os.environ.get("SALARY_MCP_HOST", "127.0.0.1")
+    
+    @property
+    def mcp_port(self) -> int:
+        return int(os.environ.get("SALARY_MCP_PORT", "8000"))
+    
+    @property
+    def mcp_workers(self) -> int:
+        return int(os.environ.get("SALARY_MCP_WORKERS", str(os.cpu_count() or 1)))
+    
+    @property
+    def batch_max_in_flight(self) -> int:
+        return int(os.environ.get("SALARY_BATCH_MAX_IN_FLIGHT", "4"))
+    
+    @property
+    def similarity_ttl_seconds(self) -> float:
+        return float(os.environ.get("SALARY_SIMILARITY_TTL", "3600"))
+    
+    @property
+    def similarity_max_entries(self) -> int:
+        return int(os.environ.get("SALARY_SIMILARITY_MAX_ENTRIES", "1000"))
+    
+    @property
+    def memory_ceiling_mb(self) -> int:
+        # 0 derives the ceiling from the container memory limit (see workflow.memory)
+        return int(os.environ.get("SALARY_MEMORY_CEILING_MB", "0"))
+    
+    @property
+    def comparison_cells_per_call(self) -> int:
+        return int(os.environ.get("SALARY_COMPARISON_CELLS_PER_CALL", "5"))
+    
+    @property
+    def mcp_graceful_shutdown_timeout(self) -> int:
+        return int(os.environ.get("SALARY_MCP_SHUTDOWN_TIMEOUT", "30"))
 
 # Global config instance
 config = Config()
@@ -0,0 +1,218 @@
+"""
+Resident daemon that keeps a warm WorkflowManager behind a Unix domain socket.
+
+Start it once with ``python main.py --daemon``; afterwards
+``python main.py --query ...`` forwards the query to the daemon and streams
+the formatted report back, skipping agent construction, workflow
+compilation and connection setup. When no daemon is listening the CLI runs
+the query in-process as before.
+
+Protocol (one request per connection): the client sends one JSON line
+``{"query": "...", "cassette_mode": "off"}``; the daemon acknowledges it at
+once with ``{"accepted": true}``, then answers with one JSON status line
+(``{"ok": true}`` or ``{"ok": false, "error": "..."}``) followed by the
+report text until it closes the connection. A request whose cassette mode
+differs from the daemon's is refused with ``"mode_mismatch": true`` instead
+of the acknowledgement, and the client runs the query itself, as it does
+when the daemon does not acknowledge within ``SALARY_DAEMON_CONNECT_TIMEOUT``
+or answer within ``SALARY_DAEMON_TIMEOUT`` seconds.
+
+The client side only uses the standard library so that forwarding a query
+does not pay for importing the agent stack.
+"""
+import codecs
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import threading
+from typing import IO
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Handle one forwarded query."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            query = request["query"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_status(ok=False, error=f"Bad request: {e}")
+            return
+
+        # Never answer a record/replay run from live upstreams (or the reverse)
+        cassette_mode = request.get("cassette_mode", "off")
+        if cassette_mode != config.cassette_mode:
+            self._send_status(
+                ok=False,
+                mode_mismatch=True,
+                error=f"Daemon cassette mode is '{config.cassette_mode}', request wants '{cassette_mode}'"
+            )
+            return
+        # Tells the client the daemon is alive before the (long) analysis starts
+        self._send_status(accepted=True)
+
+        try:
+            report = self.server.workflow_manager.analyze_salary(query)
+        except Exception as e:
+            logger.error(f"Failed to analyze query '{query}': {e}")
+            self._send_status(ok=False, error=str(e))
+            return
+
+        self._send_status(ok=True)
+        sink = _SocketWriter(self.wfile)
+        self.server.report_generator.print_formatted_report(report, sink)
+
+    def _send_status(self, **status):
+        self.wfile.write((json.dumps(status) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+class _SocketWriter:
+    """Text sink that streams UTF-8 straight to the socket."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        self.wfile.write(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        self.wfile.flush()
+
+class SalaryDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server owning one warm WorkflowManager."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = None):
+        # Imported here so the client path never loads the agent stack
+        from workflow.manager import WorkflowManager
+        from agents.report_generator import ReportGeneratorAgent
+
+        self.socket_path = socket_path or config.daemon_socket
+        _private_directory(os.path.dirname(os.path.abspath(self.socket_path)))
+        _remove_stale_socket(self.socket_path)
+
+        logger.info("🔥 Warming up workflow manager")
+        self.workflow_manager = WorkflowManager()
+        self.report_generator = ReportGeneratorAgent()
+
+        # Only the owning user may talk to the daemon: the socket is created 0600
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(self.socket_path, _QueryHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def serve(self):
+        """Serve until SIGINT/SIGTERM, then remove the socket."""
+        def stop(signum, frame):
+            logger.info("🛑 Stopping salary daemon")
+            # shutdown() blocks until serve_forever returns, so call it off the main thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        logger.info(f"🚀 Salary daemon listening on {self.socket_path}")
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+def forward_query(query: str, sink: IO, socket_path: str = None) -> bool:
+    """Send ``query`` to a running daemon and stream its report to ``sink``.
+
+    Returns False when no daemon is listening, it runs with a different
+    cassette mode, or it does not respond in time, so the caller can run the
+    query in-process instead. Raises RuntimeError if the daemon reports an
+    error or stalls after part of the report has been written.
+    """
+    socket_path = socket_path or config.daemon_socket
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    if not _owned_socket(socket_path):
+        # Someone else could have planted it to read queries or return fake reports
+        logger.warning(f"⚠️ Ignoring {socket_path}: not a socket owned by this user")
+        return False
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # A daemon that is alive but stuck must not block the CLI
+    client.settimeout(config.daemon_connect_timeout)
+    try:
+        try:
+            client.connect(socket_path)
+            request = {"query": query, "cassette_mode": config.cassette_mode}
+            client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            reader = client.makefile("rb")
+            status = json.loads(reader.readline().decode("utf-8") or "{}")
+            if status.get("mode_mismatch"):
+                logger.warning(f"⚠️ Not using the daemon: {status.get('error')}")
+                return False
+            if status.get("accepted"):
+                client.settimeout(config.daemon_timeout)
+                status = json.loads(reader.readline().decode("utf-8") or "{}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+        except socket.timeout:
+            logger.warning(f"⚠️ Daemon at {socket_path} did not respond in time; running in-process")
+            return False
+        if not status.get("ok"):
+            raise RuntimeError(status.get("error", "Daemon closed the connection"))
+
+        # Incremental decoding so multi-byte characters split across reads survive
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                chunk = reader.read1(65536)
+                if not chunk:
+                    break
+                sink.write(decoder.decode(chunk))
+                sink.flush()
+        except socket.timeout:
+            raise RuntimeError("Daemon stopped sending the report")
+        sink.write(decoder.decode(b"", final=True))
+        return True
+    finally:
+        client.close()
+
+def _private_directory(directory: str):
+    """Create ``directory`` as 0700 if needed and make sure only this user controls it."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(
+            f"Refusing to put the daemon socket in {directory}: it must be owned by this "
+            f"user and not writable by others (set SALARY_DAEMON_SOCKET or --socket)"
+        )
+
+def _owned_socket(socket_path: str) -> bool:
+    """True if ``socket_path`` is a Unix socket owned by the current user."""
+    info = os.lstat(socket_path)
+    if not stat.S_ISSOCK(info.st_mode):
+        return False
+    return not hasattr(os, "getuid") or info.st_uid == os.getuid()
+
+def _remove_stale_socket(socket_path: str):
+    """Remove a socket file left behind by a daemon that is no longer running."""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+    else:
+        raise RuntimeError(f"A salary daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
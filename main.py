@@ -1,15 +1,17 @@
 """
 Main application entry point for the Salary Analyzer system.
 """
+import os
 import sys
 import logging
 # import asyncio # No longer needed directly in main.py for MCP mode
 from typing import List
 
-from workflow.manager import WorkflowManager
-from agents.report_generator import ReportGeneratorAgent
-# We will import SalaryAnalyzerMCP directly for the --mcp mode
-from agents.server import SalaryAnalyzerMCP, start_mcp_server # Keep start_mcp_server for other modes if needed, but not for --mcp directly
+# Only lightweight modules are imported up front: forwarding a query to the
+# daemon must not pay for loading LangGraph, LangChain and FastMCP.
+# The agent stack is imported inside the modes that need it.
+import daemon
+from config import config
 
 # Set up basic logging (optional, but good practice)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,6 +21,9 @@ class SalaryAnalyzerApp:
     """Main application class for the Salary Analyzer system."""
     
     def __init__(self):
+        from workflow.manager import WorkflowManager
+        from agents.report_generator import ReportGeneratorAgent
+        
         self.workflow_manager = WorkflowManager()
         self.report_generator = ReportGeneratorAgent()
     
@@ -46,9 +51,89 @@ class SalaryAnalyzerApp:
             result = self.run_analysis(query)
             results.append(result)
         return results
+    
+    def run_batch_file(self, path: str, output: str = "-", max_in_flight: int = None):
+        """Stream queries from a JSONL/CSV file and write JSONL reports as they complete."""
+        from workflow.batch import BatchRunner, iter_queries
+        
+        runner = BatchRunner(self.workflow_manager, max_in_flight)
+        if output == "-":
+            return runner.run(iter_queries(path), sys.stdout)
+        with open(output, "w", encoding="utf-8") as sink:
+            return runner.run(iter_queries(path), sink)
+
+    def run_comparison(self, titles: List[str], locations: List[str], experiences: List[str],
+                       fmt: str = "grid", output: str = "-"):
+        """Compare salaries across a title × location × experience grid and print one table."""
+        from agents.renderers import get_renderer
+        
+        report = self.workflow_manager.compare_salaries(titles, locations, experiences)
+        renderer = get_renderer(fmt)
+        if output != "-":
+            mode = "wb" if renderer.binary else "w"
+            with open(output, mode, encoding=None if renderer.binary else "utf-8") as sink:
+                report.render(sink, fmt)
+        elif renderer.binary:
+            report.render(sys.stdout.buffer, fmt)
+        else:
+            if renderer.display:
+                print("\n" + "="*80)
+                print("📊 SALARY COMPARISON")
+                print("="*80)
+            report.render(sys.stdout, fmt)
+            print()
+        return report
+
+# Options accepted in every mode
+GLOBAL_OPTIONS = ("--record", "--replay", "--replay-latency")
+
+def _option(flag: str, default=None):
+    """Return the value following ``flag`` on the command line, or ``default``."""
+    if flag in sys.argv:
+        index = sys.argv.index(flag)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def _positional_args(args: List[str]) -> List[str]:
+    """Drop global option flags (and their values) from a list of arguments."""
+    words, skip = [], False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in GLOBAL_OPTIONS:
+            skip = True
+        else:
+            words.append(arg)
+    return words
+
+def _without_option(args: List[str], flag: str) -> List[str]:
+    """Drop ``flag`` and its value from a list of arguments."""
+    if flag in args:
+        index = args.index(flag)
+        return args[:index] + args[index + 2:]
+    return args
+
+def _configure_cassette():
+    """Apply --record/--replay/--replay-latency (anywhere on the command line) before any agent is created.
+    
+    Settings go through the environment so MCP worker processes inherit them.
+    """
+    if _option("--record"):
+        os.environ["SALARY_CASSETTE_MODE"] = "record"
+        os.environ["SALARY_CASSETTE_PATH"] = _option("--record")
+    elif _option("--replay"):
+        os.environ["SALARY_CASSETTE_MODE"] = "replay"
+        os.environ["SALARY_CASSETTE_PATH"] = _option("--replay")
+    if _option("--replay-latency"):
+        os.environ["SALARY_CASSETTE_LATENCY"] = _option("--replay-latency")
+    # The remaining arguments select the mode as usual
+    sys.argv[1:] = _positional_args(sys.argv[1:])
 
 def main():
     """Main entry point of the application."""
+    _configure_cassette()
+    
     # Example test queries
     test_queries = [
         "data engineer salary of 5 year experience candidate in pune",
@@ -59,14 +144,69 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1] == "--mcp":
         # Start MCP server mode
         logger.info("🚀 Starting MCP Server...")
+        # We will import SalaryAnalyzerMCP directly for the --mcp mode
+        from agents.server import SalaryAnalyzerMCP, serve_http
+        if "--http" in sys.argv:
+            # Networked mode: python main.py --mcp --http [--host H] [--port P] [--workers N] [--transport sse]
+            port = _option("--port")
+            workers = _option("--workers")
+            serve_http(
+                host=_option("--host"),
+                port=int(port) if port else None,
+                workers=int(workers) if workers else None,
+                transport=_option("--transport", "streamable-http")
+            )
+            return
         # Instantiate SalaryAnalyzerMCP and directly call its mcp.run() method.
         # This allows fastmcp to manage the event loop itself, preventing RuntimeError.
         mcp_analyzer = SalaryAnalyzerMCP()
         mcp_analyzer.mcp.run() # This call blocks until the server is stopped
-    elif len(sys.argv) > 1 and sys.argv[1] == "--query":
-        # Single query mode
+    elif len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        # Resident mode: keep a warm workflow manager behind a Unix socket
+        daemon.SalaryDaemon(_option("--socket")).serve()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--batch-file":
+        # Streaming batch mode: python main.py --batch-file queries.jsonl [--output out.jsonl]
+        #                       [--max-in-flight N]
         if len(sys.argv) > 2:
-            query = " ".join(sys.argv[2:])
+            max_in_flight = _option("--max-in-flight")
+            app = SalaryAnalyzerApp()
+            app.run_batch_file(
+                sys.argv[2],
+                output=_option("--output", "-"),
+                max_in_flight=int(max_in_flight) if max_in_flight else None
+            )
+        else:
+            print("Please provide a file: python main.py --batch-file queries.jsonl [--output results.jsonl]")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--compare":
+        # Grid comparison: python main.py --compare --titles "A,B" --locations "X,Y"
+        #                  [--experience "3 years,5 years"] [--format markdown] [--output F]
+        titles = _option("--titles")
+        locations = _option("--locations")
+        if titles and locations:
+            app = SalaryAnalyzerApp()
+            app.run_comparison(
+                titles.split(","),
+                locations.split(","),
+                _option("--experience", "").split(","),
+                fmt=_option("--format", "grid"),
+                output=_option("--output", "-")
+            )
+        else:
+            print('Please provide both axes: python main.py --compare --titles "A,B" --locations "X,Y" [--experience "5 years"]')
+    elif len(sys.argv) > 1 and sys.argv[1] == "--query":
+        # Single query mode: python main.py --query "..." [--socket PATH]
+        words = _without_option(sys.argv[2:], "--socket")
+        if words:
+            query = " ".join(words)
+            try:
+                # A running daemon answers without any startup or warm-up cost.
+                # Recording or replaying must see this process's upstream calls, so
+                # those runs always stay in-process.
+                if config.cassette_mode == "off" and daemon.forward_query(query, sys.stdout, _option("--socket")):
+                    return
+            except RuntimeError as e:
+                logger.error(f"Failed to analyze query '{query}': {e}")
+                return
             app = SalaryAnalyzerApp()
             app.run_analysis(query)
         else:
@@ -1,8 +1,8 @@
 """
 Data models for the Salary Analyzer system.
 """
-from dataclasses import dataclass
-from typing import TypedDict, List, Optional
+from dataclasses import dataclass, field
+from typing import IO, TypedDict, List, Optional
 
 @dataclass
 class ParsedQuery:
@@ -12,6 +12,13 @@ class ParsedQuery:
     years_experience: str
     original_query: str
 
+    def normalized_key(self) -> tuple:
+        """Return a (title, location, experience) key that ignores case and spacing."""
+        return tuple(
+            " ".join((value or "").lower().split())
+            for value in (self.job_title, self.location, self.years_experience)
+        )
+
 @dataclass
 class SalaryData:
     """Salary data model."""
@@ -30,10 +37,30 @@ class StructuredSalaryReport:
     years_experience: str
     salary_data: List[SalaryData]
     market_insights: str
-    summary_table: str
+    # Rendered lazily from salary_data on first access of summary_table
+    _summary_table: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def summary_table(self) -> str:
+        """Grid table of salary_data, rendered on first use."""
+        if self._summary_table is None:
+            from agents.renderers import render_salary_table_to_string
+            self._summary_table = render_salary_table_to_string(self.salary_data)
+        return self._summary_table
+
+    def render(self, sink: IO, fmt: str = "grid") -> None:
+        """Stream the salary table to ``sink`` in the given format."""
+        if fmt == "grid" and self._summary_table is not None:
+            sink.write(self._summary_table)
+            return
+        from agents.renderers import render_salary_table
+        render_salary_table(self.salary_data, sink, fmt)
 
 class AgentState(TypedDict):
-    """Agent workflow state model."""
+    """Agent workflow state model.
+    
+    ``scraped_data`` and ``structured_data`` are emptied once the next node has consumed them.
+    """
     original_query: str
     parsed_query: ParsedQuery
     scraped_data: List[dict]
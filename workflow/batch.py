@@ -0,0 +1,139 @@
+"""
+Streaming batch runner: reads queries lazily and writes one JSONL record per report.
+"""
+import csv
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Set
+
+from config import config
+from models import StructuredSalaryReport
+from workflow.memory import MemoryCeiling
+
+logger = logging.getLogger(__name__)
+
+def iter_queries(path: str) -> Iterator[str]:
+    """Yield queries one at a time from a JSONL or CSV file.
+
+    JSONL lines may be a plain JSON string or an object with a ``query`` key.
+    CSV files use the ``query`` column when present, otherwise the first column.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            if "query" in header:
+                column = header.index("query")
+            else:
+                # No header row: the first line is already a query
+                column = 0
+                if header and header[0].strip():
+                    yield header[0].strip()
+            for row in reader:
+                if len(row) > column and row[column].strip():
+                    yield row[column].strip()
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.error(f"❌ Skipping invalid JSON on line {line_number}: {e}")
+                    continue
+                query = item.get("query") if isinstance(item, dict) else item
+                if isinstance(query, str) and query.strip():
+                    yield query.strip()
+
+def report_to_record(query: str, report: StructuredSalaryReport) -> Dict[str, Any]:
+    """Convert a report into a JSON-serialisable batch record."""
+    return {
+        "query": query,
+        "success": True,
+        "report": {
+            "job_title": report.job_title,
+            "location": report.location,
+            "years_experience": report.years_experience,
+            "market_insights": report.market_insights.strip(),
+            "salary_data": [asdict(item) for item in report.salary_data],
+        },
+    }
+
+class BatchRunner:
+    """Run queries through a WorkflowManager with bounded in-flight work.
+
+    At most ``max_in_flight`` analyses run at once; reading the input pauses
+    until one finishes, so memory stays flat however large the input is.
+    Records are written in completion order, not input order.
+
+    Record building runs in the analysing thread: it costs well under a
+    millisecond per report, less than handing the report to another process.
+
+    While resident memory is over ``memory_ceiling`` no new query is
+    started. In-flight work drains and its results are written out first.
+    """
+
+    def __init__(self, workflow_manager, max_in_flight: Optional[int] = None,
+                 memory_ceiling: Optional[MemoryCeiling] = None):
+        self.workflow_manager = workflow_manager
+        self.max_in_flight = max_in_flight or config.batch_max_in_flight
+        self.memory_ceiling = memory_ceiling or MemoryCeiling()
+
+    def run(self, queries: Iterable[str], sink: IO) -> Dict[str, int]:
+        """Process every query and write one JSON line per result to ``sink``."""
+        stats = {"total": 0, "succeeded": 0, "failed": 0}
+        pending: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for query in queries:
+                while len(pending) >= self.max_in_flight:
+                    # Backpressure: wait for a slot before reading more input
+                    pending = self._wait(pending, sink, stats)
+                pending = self._wait_for_memory(pending, sink, stats)
+                future = executor.submit(self._analyze, query)
+                pending.add(future)
+                stats["total"] += 1
+
+            while pending:
+                pending = self._wait(pending, sink, stats)
+
+        logger.info(f"✅ Batch complete: {stats['succeeded']} succeeded, {stats['failed']} failed")
+        return stats
+
+    def _wait_for_memory(self, pending: Set[Future], sink: IO, stats: Dict[str, int]) -> Set[Future]:
+        """Hold back new work while over the memory ceiling, draining in-flight work meanwhile."""
+        if not self.memory_ceiling.exceeded():
+            return pending
+        logger.warning(f"⚠️ Memory ceiling reached: {self.memory_ceiling.describe()}; pausing new queries")
+        while pending and self.memory_ceiling.exceeded():
+            pending = self._wait(pending, sink, stats)
+        if self.memory_ceiling.exceeded():
+            logger.warning(f"⚠️ Still over the memory ceiling with nothing in flight ({self.memory_ceiling.describe()}); continuing one query at a time")
+        else:
+            logger.info(f"▶️ Resuming: {self.memory_ceiling.describe()}")
+        return pending
+
+    def _wait(self, pending: Set[Future], sink: IO, stats: Dict[str, int]) -> Set[Future]:
+        """Wait for the next completion and write its results."""
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        self._write_completed(done, sink, stats)
+        return pending
+
+    def _analyze(self, query: str) -> Dict[str, Any]:
+        try:
+            report = self.workflow_manager.analyze_salary(query)
+            return report_to_record(query, report)
+        except Exception as e:
+            logger.error(f"Failed to analyze query '{query}': {e}")
+            return {"query": query, "success": False, "error": str(e)}
+
+    def _write_completed(self, done: Set[Future], sink: IO, stats: Dict[str, int]):
+        for future in done:
+            record = future.result()
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stats["succeeded" if record["success"] else "failed"] += 1
+        sink.flush()
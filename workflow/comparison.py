@@ -0,0 +1,173 @@
+"""
+Grid comparison: salaries for every title × location × experience combination.
+
+The grid is planned as a whole instead of running ``analyze_salary`` once per
+cell. Axis values are already structured, so nothing goes through the query
+parser; identical search queries are sent once and shared by every cell that
+needs them; and cells are structured several at a time in one LLM call.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterable, List, Optional
+
+from config import config
+from models import ParsedQuery, SalaryData
+from agents.renderers import Rows, get_renderer
+
+logger = logging.getLogger(__name__)
+
+# Statistics cover one currency per cell; rows in other currencies are counted as excluded
+COMPARISON_HEADERS = ["Job Title", "Location", "Experience", "Sources", "Excluded", "Data Points",
+                      "Min Salary", "Average Salary", "Max Salary"]
+COMPARISON_FIELDS = ["job_title", "location", "years_experience", "sources", "excluded", "data_points",
+                     "currency", "min_salary", "average_salary", "max_salary"]
+COMPARISON_TYPES = {
+    "job_title": "string", "location": "string", "years_experience": "string",
+    "sources": "int64", "excluded": "int64", "data_points": "int64", "currency": "string",
+    "min_salary": "float64", "average_salary": "float64", "max_salary": "float64",
+}
+
+@dataclass
+class ComparisonCell:
+    """One title/location/experience combination and its results."""
+    parsed_query: ParsedQuery
+    salary_data: List[SalaryData] = field(default_factory=list)
+    statistics: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class ComparisonReport:
+    """Results for a whole comparison grid."""
+    cells: List[ComparisonCell]
+    # Upstream calls made for the grid, and what running each cell separately would have cost
+    search_calls: int = 0
+    llm_calls: int = 0
+    separate_search_calls: int = 0
+    separate_llm_calls: int = 0
+
+    def render(self, sink: IO, fmt: str = "grid"):
+        """Stream the comparison table to ``sink`` in the given format."""
+        renderer = get_renderer(fmt)
+        if renderer.display:
+            renderer.render(COMPARISON_HEADERS, Rows(self.cells, _comparison_row), sink)
+        else:
+            renderer.render(COMPARISON_FIELDS, Rows(self.cells, _comparison_values), sink, COMPARISON_TYPES)
+
+class GridComparison:
+    """Plans and runs a title × location × experience comparison on a WorkflowManager's agents."""
+
+    def __init__(self, workflow_manager, cells_per_call: Optional[int] = None):
+        self.scraper = workflow_manager.scraper
+        self.structuring_agent = workflow_manager.structuring_agent
+        self.report_generator = workflow_manager.report_generator
+        self.cells_per_call = cells_per_call or config.comparison_cells_per_call
+
+    def compare(self, titles: Iterable[str], locations: Iterable[str],
+                experiences: Iterable[str]) -> ComparisonReport:
+        """Compare salaries across every combination of the given axis values."""
+        titles, locations, experiences = _axis(titles), _axis(locations), _axis(experiences)
+        if not titles or not locations:
+            raise ValueError("A comparison needs at least one job title and one location")
+        # No experience axis: one level with no experience term in the searches
+        experiences = experiences or [""]
+
+        cells = [
+            ComparisonCell(ParsedQuery(
+                job_title=title,
+                location=location,
+                years_experience=experience,
+                original_query=" ".join(f"{title} salary {experience} {location}".split())
+            ))
+            for title in titles for location in locations for experience in experiences
+        ]
+        logger.info(f"🧮 Comparing {len(titles)} titles × {len(locations)} locations × "
+                    f"{len(experiences)} experience levels ({len(cells)} cells)")
+
+        # Plan searches for the whole grid, then send each distinct one once
+        cell_queries = [self.scraper.grid_search_queries_for(cell.parsed_query) for cell in cells]
+        planned: Dict[str, str] = {}
+        for queries in cell_queries:
+            for query in queries:
+                planned.setdefault(_query_key(query), query)
+        fetched = self.scraper.fetch_search_results(list(planned.values()))
+        results = {key: fetched[query] for key, query in planned.items()}
+
+        # Structure several cells per LLM call
+        llm_calls = 0
+        for start in range(0, len(cells), self.cells_per_call):
+            batch = cells[start:start + self.cells_per_call]
+            inputs = [
+                (cell.parsed_query, [item for q in queries for item in results[_query_key(q)]])
+                for cell, queries in zip(batch, cell_queries[start:start + self.cells_per_call])
+            ]
+            if any('error' not in item for _, raw_data in inputs for item in raw_data):
+                llm_calls += 1
+            try:
+                structured = self.structuring_agent.structure_batch_sync(inputs)
+            except Exception as e:
+                logger.error(f"Failed to structure comparison cells {start}-{start + len(batch) - 1}: {e}")
+                structured = [[] for _ in batch]
+            for cell, salary_data in zip(batch, structured):
+                cell.salary_data = salary_data
+
+        for cell in cells:
+            cell.statistics = self.report_generator.salary_statistics(cell.salary_data)
+
+        report = ComparisonReport(
+            cells=cells,
+            search_calls=len(planned),
+            llm_calls=llm_calls,
+            # One parse, two searches and one structuring call per separately analyzed cell
+            separate_search_calls=2 * len(cells),
+            separate_llm_calls=2 * len(cells),
+        )
+        logger.info(
+            f"📉 Upstream calls: {report.search_calls} searches + {report.llm_calls} LLM calls "
+            f"(cell by cell: {report.separate_search_calls} + {report.separate_llm_calls})"
+        )
+        return report
+
+def _axis(values: Iterable[str]) -> List[str]:
+    """Trim, collapse whitespace and drop repeated (case-insensitive) axis values, keeping order."""
+    seen = {}
+    for value in values:
+        value = " ".join((value or "").split())
+        if value and value.lower() not in seen:
+            seen[value.lower()] = value
+    return list(seen.values())
+
+def _query_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _comparison_row(cell: ComparisonCell) -> List[Any]:
+    stats = cell.statistics
+    currency = stats.get("currency") or ""
+
+    def money(value):
+        return f"{currency} {value:,.0f}".strip() if value is not None else "N/A"
+
+    return [
+        cell.parsed_query.job_title,
+        cell.parsed_query.location,
+        cell.parsed_query.years_experience or "Any",
+        stats.get("sources", 0),
+        stats.get("excluded", 0),
+        stats.get("data_points", 0),
+        money(stats.get("min_salary")),
+        money(stats.get("average_salary")),
+        money(stats.get("max_salary")),
+    ]
+
+def _comparison_values(cell: ComparisonCell) -> List[Any]:
+    stats = cell.statistics
+    return [
+        cell.parsed_query.job_title,
+        cell.parsed_query.location,
+        cell.parsed_query.years_experience,
+        stats.get("sources", 0),
+        stats.get("excluded", 0),
+        stats.get("data_points", 0),
+        stats.get("currency"),
+        stats.get("min_salary"),
+        stats.get("average_salary"),
+        stats.get("max_salary"),
+    ]
@@ -2,6 +2,7 @@
 Workflow Manager for orchestrating the multi-agent salary analysis process.
 """
 import logging
+from typing import List
 from langgraph.graph import StateGraph, END
 
 from models import AgentState, StructuredSalaryReport
@@ -9,6 +10,9 @@ from agents.query_parser import QueryParserAgent
 from agents.scraper import ScraperAgent
 from agents.structuring import StructuringAgent
 from agents.report_generator import ReportGeneratorAgent
+from workflow.singleflight import SingleFlight
+from workflow.similarity import SimilarityIndex
+from workflow.comparison import ComparisonReport, GridComparison
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,8 @@ class WorkflowManager:
         self.scraper = ScraperAgent()
         self.structuring_agent = StructuringAgent()
         self.report_generator = ReportGeneratorAgent()
+        self.in_flight = SingleFlight()
+        self.similar_queries = SimilarityIndex()
         self.workflow = self._build_workflow()
     
     def _build_workflow(self):
@@ -43,6 +49,9 @@ class WorkflowManager:
     
     def _query_parser_node(self, state: AgentState):
         """Parse the user query."""
+        if state.get('parsed_query') is not None:
+            # Already parsed by analyze_salary to build the coalescing key
+            return {"parsed_query": state['parsed_query']}
         logger.info("--- 🔍 INVOKING QUERY PARSER AGENT ---")
         parsed_query = self.query_parser.parse_query_sync(state['original_query'])
         return {"parsed_query": parsed_query}
@@ -61,7 +70,8 @@ class WorkflowManager:
             state['scraped_data'], 
             state['parsed_query']
         )
-        return {"structured_data": structured_data}
+        # Raw search results are not needed downstream
+        return {"scraped_data": [], "structured_data": structured_data}
     
     def _report_generation_node(self, state: AgentState):
         """Generate final structured report."""
@@ -72,24 +82,47 @@ class WorkflowManager:
             state['structured_data']
         )
         
-        return {"final_report": final_report}
+        # The rows now live in the report only
+        return {"structured_data": [], "final_report": final_report}
+    
+    def _run_workflow(self, initial_state: AgentState) -> StructuredSalaryReport:
+        """Run the graph and remember the report for near-duplicate queries."""
+        final_report = self.workflow.invoke(initial_state)['final_report']
+        self.similar_queries.add(initial_state['parsed_query'], final_report)
+        return final_report
     
     def analyze_salary(self, query: str) -> StructuredSalaryReport:
         """Execute the complete salary analysis workflow."""
         logger.info(f"🚀 Starting salary analysis for: '{query}'")
         
-        initial_state = {
-            "original_query": query,
-            "parsed_query": None,
-            "scraped_data": [],
-            "structured_data": [],
-            "final_report": None,
-            "errors": []
-        }
-        
         try:
-            final_state = self.workflow.invoke(initial_state)
-            return final_state['final_report']
+            parsed_query = self.query_parser.parse_query_sync(query)
+            
+            # Reuse a recent result for a near-duplicate query before scraping
+            report = self.similar_queries.lookup(parsed_query)
+            if report is not None:
+                logger.info("♻️ Reusing result of an equivalent recent query")
+                return report
+            
+            initial_state = {
+                "original_query": query,
+                "parsed_query": parsed_query,
+                "scraped_data": [],
+                "structured_data": [],
+                "final_report": None,
+                "errors": []
+            }
+            
+            # Concurrent requests for the same normalized query share one run
+            return self.in_flight.do(
+                parsed_query.normalized_key(),
+                lambda: self._run_workflow(initial_state)
+            )
         except Exception as e:
             logger.error(f"Error in salary analysis: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def compare_salaries(self, titles: List[str], locations: List[str],
+                         experiences: List[str]) -> ComparisonReport:
+        """Compare salaries across a title × location × experience grid with shared searches and LLM calls."""
+        return GridComparison(self).compare(titles, locations, experiences)
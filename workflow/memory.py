@@ -0,0 +1,121 @@
+"""
+Memory measurement and the batch memory ceiling.
+"""
+import gc
+import logging
+import multiprocessing
+import os
+from typing import Dict, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# cgroup v2 and v1 locations of the container memory limit, usage and statistics
+CGROUP_LIMIT_FILES = (
+    "/sys/fs/cgroup/memory.max",
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+)
+CGROUP_USAGE_FILES = (
+    ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.stat", "inactive_file"),
+    ("/sys/fs/cgroup/memory/memory.usage_in_bytes", "/sys/fs/cgroup/memory/memory.stat", "total_inactive_file"),
+)
+# Share of the container limit used when no explicit ceiling is configured
+CONTAINER_LIMIT_SHARE = 0.8
+
+def rss_bytes(pid: str = "self") -> Optional[int]:
+    """Current resident set size of a process, or None where it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+def process_tree_rss_bytes() -> Optional[int]:
+    """RSS of this process plus its child processes."""
+    total = rss_bytes()
+    if total is None:
+        return None
+    for child in multiprocessing.active_children():
+        total += rss_bytes(str(child.pid)) or 0
+    return total
+
+def container_limit_bytes() -> Optional[int]:
+    """Memory limit of the enclosing cgroup, or None when unlimited or unknown."""
+    for path in CGROUP_LIMIT_FILES:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # "max" (v2) or a huge sentinel (v1) means no limit
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    return None
+
+def container_usage_bytes() -> Optional[int]:
+    """Working set of the enclosing cgroup (usage minus reclaimable file cache), or None."""
+    for usage_path, stat_path, inactive_key in CGROUP_USAGE_FILES:
+        try:
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        inactive = _memory_stat(stat_path).get(inactive_key, 0)
+        return max(0, usage - inactive)
+    return None
+
+class MemoryCeiling:
+    """Memory limit that long runs stay under.
+
+    With ``SALARY_MEMORY_CEILING_MB`` set, the RSS of this process and its
+    child processes is checked against it. Otherwise the
+    ceiling is 80% of the container memory limit, checked against the whole
+    cgroup's working set, since that is what the OOM killer acts on. The
+    ceiling is disabled when neither is known.
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self._measure = process_tree_rss_bytes
+        if limit_bytes is None:
+            if config.memory_ceiling_mb > 0:
+                limit_bytes = config.memory_ceiling_mb * 1024 * 1024
+            else:
+                container_limit = container_limit_bytes()
+                if container_limit and container_usage_bytes() is not None:
+                    limit_bytes = int(container_limit * CONTAINER_LIMIT_SHARE)
+                    self._measure = container_usage_bytes
+        if limit_bytes and self._measure() is None:
+            logger.warning("⚠️ Cannot measure memory on this platform; memory ceiling disabled")
+            limit_bytes = None
+        self.limit_bytes = limit_bytes or None
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit_bytes is not None
+
+    def usage_bytes(self) -> int:
+        return self._measure() or 0
+
+    def exceeded(self) -> bool:
+        """True if memory use is over the limit even after a garbage collection."""
+        if not self.enabled or self.usage_bytes() <= self.limit_bytes:
+            return False
+        gc.collect()
+        return self.usage_bytes() > self.limit_bytes
+
+    def describe(self) -> str:
+        return f"{self.usage_bytes() / 2**20:.0f} MB in use (ceiling {self.limit_bytes / 2**20:.0f} MB)"
+
+def _memory_stat(path: str) -> Dict[str, int]:
+    stats = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(" ")
+                if value.strip().isdigit():
+                    stats[name] = int(value)
+    except OSError:
+        pass
+    return stats
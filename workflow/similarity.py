@@ -0,0 +1,73 @@
+"""
+Local index for reusing results of near-duplicate queries.
+
+A report depends only on the parsed job title, location and experience, so
+two queries are duplicates when those fields match after normalization,
+however differently the original queries were worded. Normalization ignores
+case, punctuation and spacing, and keeps only the numbers of an experience
+level that has any. Everything runs in-process.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from config import config
+from models import ParsedQuery
+
+MatchKey = Tuple[str, str, Tuple[str, ...]]
+
+class SimilarityIndex:
+    """Bounded, time-limited index of recent results keyed by normalized parsed fields."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.similarity_ttl_seconds
+        self.max_entries = max_entries or config.similarity_max_entries
+        self._lock = threading.Lock()
+        # match key -> (created_at, result); oldest first
+        self._entries: "OrderedDict[MatchKey, Tuple[float, Any]]" = OrderedDict()
+
+    def lookup(self, parsed_query: ParsedQuery) -> Optional[Any]:
+        """Return the recent result stored for an equivalent query, if any."""
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(_match_key(parsed_query))
+        return entry[1] if entry is not None else None
+
+    def add(self, parsed_query: ParsedQuery, result: Any) -> None:
+        """Store ``result`` for ``parsed_query``, evicting the oldest entries if full."""
+        key = _match_key(parsed_query)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _expire(self, now: float):
+        while self._entries:
+            created_at = next(iter(self._entries.values()))[0]
+            if now - created_at <= self.ttl_seconds:
+                break
+            self._entries.popitem(last=False)
+
+def _match_key(parsed_query: ParsedQuery) -> MatchKey:
+    """Fields that must be identical (after normalization) for a result to be reused."""
+    return (
+        _match_text(parsed_query.job_title),
+        _match_text(parsed_query.location),
+        _experience_numbers(parsed_query),
+    )
+
+def _match_text(text: str) -> str:
+    # Unicode-aware, so non-ASCII titles and places do not all normalize to ""
+    return " ".join(re.findall(r"\w+", (text or "").casefold()))
+
+def _experience_numbers(parsed_query: ParsedQuery) -> Tuple[str, ...]:
+    # "5 years" and "5 yrs exp" agree; levels without numbers ("senior") compare as text
+    numbers = re.findall(r"\d+", parsed_query.years_experience or "")
+    return tuple(numbers) or (_match_text(parsed_query.years_experience),)